@@ -2,6 +2,9 @@
 
 import getpass
 import ssl
+
+from concurrent import futures
+
 import urllib3
 
 from purestorage import FlashArray
@@ -25,7 +28,8 @@ class BaseConnector(object):
         fa_passwd=None,
         api_token=None,
         vcenter_passwd=None,
-        verify_ssl=True):
+        verify_ssl=True,
+        secret_provider=getpass.getpass):
         """Connect to FlashArray and vSphere environments as requested by end-user.
 
         Args:
@@ -37,13 +41,48 @@ class BaseConnector(object):
             vcenter_usr (str): Authenticated User for vCenter Server.
             vcenter_passwd (str): Password for vCenter authenticated user.
             verify_ssl (bool): Whether or not the session should be verified.
+            secret_provider (callable): Called with a prompt string to resolve a missing
+            password. Defaults to an interactive getpass prompt; batch callers can wire this to
+            a vault, keyring, or environment lookup so initialization never blocks on a TTY.
         """
-        self.fa_instance = self.connect_purestorage_fa(fa_ip, fa_usr, fa_passwd, api_token, verify_ssl)
-        self.vc_instance = self.connect_vsphere_env(vcenter_ip, vcenter_usr, vcenter_passwd, verify_ssl)
+        # Missing secrets are resolved one at a time up front; the default provider prompts on
+        # the terminal, and two concurrent prompts would race for the same TTY.
+        if not (api_token or fa_passwd):
+            fa_passwd = secret_provider('FlashArray Password: ')
+        if not vcenter_passwd:
+            vcenter_passwd = secret_provider('vSphere Password: ')
+
+        # The FlashArray and vCenter connections are independent of one another, so they are
+        # established concurrently rather than paying for two TLS handshakes back to back. The
+        # SMS connection depends on the vCenter session and stays sequential.
+        with futures.ThreadPoolExecutor(max_workers=2) as executor:
+            fa_future = executor.submit(self.connect_purestorage_fa, fa_ip, fa_usr,
+                                        password=fa_passwd, api_token=api_token,
+                                        verify_https=verify_ssl)
+            vc_future = executor.submit(self.connect_vsphere_env, vcenter_ip, vcenter_usr,
+                                        pwd=vcenter_passwd, ssl_context=verify_ssl)
+            futures.wait([fa_future, vc_future])
+
+        fa_error = fa_future.exception()
+        vc_error = vc_future.exception()
+
+        if fa_error or vc_error:
+            # The surviving session would otherwise be leaked with no logout once the exception
+            # propagates, so it is closed before re-raising.
+            if fa_error and not vc_error:
+                connect.Disconnect(vc_future.result())
+            elif vc_error and not fa_error:
+                fa_future.result().invalidate_cookie()
+            raise fa_error if fa_error else vc_error
+
+        self.fa_instance = fa_future.result()
+        self.vc_instance = vc_future.result()
+
         self.vsphere_content = self.get_env_content(self.vc_instance)
         self.sms_instance = self.connect_sms_env(vcenter_ip)
 
-    def connect_purestorage_fa(self, target, username, password=None, api_token=None, verify_https=True):
+    def connect_purestorage_fa(self, target, username, password=None, api_token=None, verify_https=True,
+                               secret_provider=getpass.getpass):
         """Create a session (verified or unverified) with the requested FlashArray.
 
         Args:
@@ -52,14 +91,16 @@ class BaseConnector(object):
             password (str): Password for FlashArray authenticated user.
             api_token (str): Authenticated API token for FlashArray.
             verify_https (bool): Whether or not the session should be verified.
+            secret_provider (callable): Called with a prompt string to resolve a missing
+            password. Defaults to an interactive getpass prompt.
 
         Returns:
             fa_instance (purestorage.FlashArray): Verified or unverified session to FlashArray.
         """
         # If end-user is using CLI and doesn't want to type their password in clear text on screen they can use this
-        # option to input their password.
+        # option to input their password. Batch callers can supply a non-interactive provider instead.
         if not (api_token or password):
-            password = getpass.getpass(prompt='FlashArray Password: ', stream=None)
+            password = secret_provider('FlashArray Password: ')
 
         if not verify_https:
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -89,7 +130,7 @@ class BaseConnector(object):
 
         return sms_instance
 
-    def connect_vsphere_env(self, host, user, pwd=None, ssl_context=True):
+    def connect_vsphere_env(self, host, user, pwd=None, ssl_context=True, secret_provider=getpass.getpass):
         """Create a session (verified or unverified) with the requested vCenter Server.
 
         Args:
@@ -97,14 +138,16 @@ class BaseConnector(object):
             user (str): Authenticated User for vCenter Server.
             pwd (str): Password for vCenter authenticated user.
             ssl_context (bool): Whether or not the session should be verified.
+            secret_provider (callable): Called with a prompt string to resolve a missing
+            password. Defaults to an interactive getpass prompt.
 
         Returns:
             vsphere_session(vim.ServiceInstance): Verified or unverified session to vCenter Server.
         """
         # If end-user is using CLI and doesn't want to type their password in clear text on screen they can use this
-        # option to input their password.
+        # option to input their password. Batch callers can supply a non-interactive provider instead.
         if not pwd:
-            pwd = getpass.getpass(prompt='vSphere Password: ', stream=None)
+            pwd = secret_provider('vSphere Password: ')
 
         if not ssl_context:
             ssl_context = None
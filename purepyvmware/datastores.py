@@ -1,12 +1,19 @@
 """For general maintenance of VMware datastores that are backed by Pure Storage FlashArrays."""
 
+import contextlib
 import time
 
+from concurrent import futures
+
 from purepyvmware.lib import datastore_utils
 from pyVmomi import vim
 from pyVmomi import sms
 
 
+class TimeoutException(Exception):
+    """Raised when a monitored task does not complete within its timeout."""
+
+
 class Datastores(object):
     """Maintenance of Pure Storage based datastores and associated array volumes."""
 
@@ -19,6 +26,50 @@ class Datastores(object):
         """
         self.flasharray = flasharray
         self.vsphere_content = vsphere_content
+        self._array_info = None
+        self._cluster_cache = {}
+
+    @property
+    def array_info(self):
+        """Identity information for the connected FlashArray.
+
+        The array's identity (name, id, version) does not change over the life of a session, so
+        the REST call behind flasharray.get() is made once and memoized rather than repeated on
+        every mapping or registration.
+
+        Returns:
+            array_info (dict): FlashArray attributes as returned by flasharray.get().
+        """
+        if self._array_info is None:
+            self._array_info = self.flasharray.get()
+
+        return self._array_info
+
+    @contextlib.contextmanager
+    def _container_view(self, view_types, container=None):
+        """Create a container view and guarantee it is destroyed after use.
+
+        A view that is not destroyed leaks session resources on vCenter, so the Destroy() call
+        lives in a finally block rather than relying on the caller reaching it. Destroying the
+        view does not remove any information within vCenter. Only the object we created to view
+        the contents of vCenter.
+
+        Args:
+            view_types (list): Managed object types the view should contain (e.g. [vim.Datastore]).
+            container (optional, vim.ManagedEntity): Inventory object to root the view at.
+            Defaults to the root folder.
+
+        Yields:
+            view_container (vim.view.ContainerView): Live container view of the requested types.
+        """
+        view_container = self.vsphere_content.viewManager.CreateContainerView(
+            container=container or self.vsphere_content.rootFolder,
+            type=view_types,
+            recursive=True)
+        try:
+            yield view_container
+        finally:
+            view_container.Destroy()
 
     def create_compute_container_view(self):
         """Create compute container view for an inventory of managed object references.
@@ -26,14 +77,8 @@ class Datastores(object):
         Returns:
             resources (vim.view.ContainerView): Object view of compute resources.
         """
-        compute_container = self.vsphere_content.viewManager.CreateContainerView(
-            container=self.vsphere_content.rootFolder,
-            type=[vim.ComputeResource],
-            recursive=True)
-        compute_resources = compute_container.view
-        # Container is no longer required once the most up-to-date information is available for use. This does not
-        # destroy any information within vCenter. Only the object we created to view the contents of vCenter.
-        compute_container.Destroy()
+        with self._container_view([vim.ComputeResource]) as compute_container:
+            compute_resources = compute_container.view
 
         return compute_resources
 
@@ -43,14 +88,8 @@ class Datastores(object):
         Returns:
             datastores (vim.view.ContainerView): Object view of datastore resources.
         """
-        datastore_container = self.vsphere_content.viewManager.CreateContainerView(
-            container=self.vsphere_content.rootFolder,
-            type=[vim.Datastore],
-            recursive=True)
-        datastores = datastore_container.view
-        # Container is no longer required once the most up-to-date information is available for use. This does not
-        # destroy any information within vCenter. Only the object we created to view the contents of vCenter.
-        datastore_container.Destroy()
+        with self._container_view([vim.Datastore]) as datastore_container:
+            datastores = datastore_container.view
 
         return datastores
 
@@ -60,15 +99,20 @@ class Datastores(object):
         Returns:
             pure_datastores (list): List of vim.Datastore objects associated with Pure Storage FlashArray(s).
         """
-        pure_datastores = []
-        all_datastores = self.create_datastore_container_view()
-
-        for datastore in all_datastores:
-            devices = datastore_utils.get_datastore_identifier(datastore)
-            for device in devices:
-                dev_match = datastore_utils.compare_identifier(device)
-                if dev_match:
-                    pure_datastores.append(datastore)
+        with self._container_view([vim.Datastore]) as datastore_container:
+            # One PropertyCollector call retrieves the identifiers for every datastore at once
+            # rather than paying a round-trip per attribute access on each datastore.
+            all_datastores = datastore_utils.retrieve_view_properties(
+                self.vsphere_content, datastore_container, vim.Datastore,
+                ['summary.type', 'info.vmfs.extent', 'info.vvolDS.hostPE'])
+
+        # any() short-circuits on the first Pure backed device, so each datastore is checked
+        # against the minimum number of identifiers and appears in the result exactly once.
+        pure_datastores = [
+            datastore for datastore, ds_props in all_datastores
+            if any(datastore_utils.compare_identifier(device)
+                   for device in datastore_utils.get_datastore_identifier(ds_props))
+        ]
 
         return pure_datastores
 
@@ -79,44 +123,72 @@ class Datastores(object):
         Args:
             esxi_hosts (list): ESXi hosts to perform a storage rescan on.
         """
-        for esxi_host in esxi_hosts:
-            esxi_host.configManager.storageSystem.RescanAllHba()
+        if not esxi_hosts:
+            return
+
+        # Each host scans its own HBAs independently, so the rescans are fanned out in parallel
+        # and the wall-clock cost drops to that of the slowest host.
+        with futures.ThreadPoolExecutor(max_workers=min(16, len(esxi_hosts))) as executor:
+            list(executor.map(
+                lambda esxi_host: esxi_host.configManager.storageSystem.RescanAllHba(),
+                esxi_hosts))
 
-    def verify_vsphere_cluster(self, cluster_name):
+    def verify_vsphere_cluster(self, cluster_name, refresh=False):
         """Verify host objects and host groups associated with the vSphere Cluster are configured on the FlashArray.
 
         Args:
             cluster_name (str): Name of the vSphere Cluster to verify.
-            flasharray (purestorage.FlashArray): Existing session to FlashArray.
+            refresh (optional, bool): Re-verify the cluster even if it was already verified on
+            this instance.
 
         Returns:
             hgroup (dict): Host group associated with vSphere cluster.
             connected_esxi_hosts (list): List of ESXi hosts in a connected state for vSphere cluster..
         """
+        # Verification walks the compute inventory and queries the array, so the result is cached
+        # per cluster and reused by composite operations instead of re-deriving it each time.
+        if not refresh and cluster_name in self._cluster_cache:
+            return self._cluster_cache[cluster_name]
+
         msg = 'Cancelling datastore creation. Please verify the object exists and is online, then try again.'
 
         cluster = None
         connected_esxi_hosts = []
         esxi_hosts = []
 
-        compute_resources = self.create_compute_container_view()
-        for compute in compute_resources:
-            if compute.name == cluster_name:
+        with self._container_view([vim.ComputeResource]) as compute_container:
+            # Only the names are needed to locate the cluster, so one PropertyCollector call
+            # fetches them all instead of a round-trip per compute resource.
+            compute_resources = datastore_utils.retrieve_view_properties(
+                self.vsphere_content, compute_container, vim.ComputeResource, ['name'])
+
+        for compute, compute_props in compute_resources:
+            if compute_props.get('name') == cluster_name:
                 cluster = compute
+                break
 
         if cluster:
-            hgroup = datastore_utils.fa_hgroup_to_vc_cluster_mapping(cluster, self.flasharray)
+            hgroup = datastore_utils.fa_hgroup_to_vc_cluster_mapping(cluster, self.flasharray, self.array_info)
             esxi_hosts = cluster.host
         else:
             raise ValueError(f'Cluster "{cluster_name}" not found on specified vCenter Server. {msg}')
 
         if esxi_hosts:
-            for esxi in esxi_hosts:
-                if esxi.runtime.connectionState == 'connected':
+            with self._container_view([vim.HostSystem], container=cluster) as host_container:
+                # One PropertyCollector call retrieves the connection state for every host in the
+                # cluster rather than paying a round-trip per host.
+                host_states = datastore_utils.retrieve_view_properties(
+                    self.vsphere_content, host_container, vim.HostSystem,
+                    ['runtime.connectionState'])
+
+            for esxi, host_props in host_states:
+                if host_props.get('runtime.connectionState') == 'connected':
                     connected_esxi_hosts.append(esxi)
         else:
             raise ValueError(f'No ESXi hosts found for "{cluster_name}". {msg}')
 
+        self._cluster_cache[cluster_name] = (hgroup, connected_esxi_hosts)
+
         return hgroup, connected_esxi_hosts
 
 
@@ -148,7 +220,9 @@ class VmfsDatastores(Datastores):
             esxi_host = connected_esxi_hosts[0]
             fa_volume = self.flasharray.create_volume(ds_name, f'{ds_size}G')
             self.flasharray.connect_hgroup(hgroup, fa_volume['name'])
-            esxi_host.configManager.storageSystem.RescanAllHba()
+            # Only the creation host needs to see the new volume before the datastore is built;
+            # the remaining hosts are rescanned once after creation.
+            Datastores.rescan_esxi_storage([esxi_host])
         else:
             raise ValueError(f'No connected hosts found for cluster "{cluster_name}".')
 
@@ -173,7 +247,9 @@ class VmfsDatastores(Datastores):
 
         datastore = host_dssystem.CreateVmfsDatastore(vmfs_creation_options[0].spec)
 
-        Datastores.rescan_esxi_storage(connected_esxi_hosts)
+        # The creation host already rescanned above and mounted the datastore itself, so only
+        # the other hosts in the cluster need a rescan to pick it up.
+        Datastores.rescan_esxi_storage([host for host in connected_esxi_hosts if host is not esxi_host])
 
         return datastore
 
@@ -195,42 +271,50 @@ class VvolDatastores(Datastores):
 
         Returns:
             vvol_ds (vim.Datastore): Newly created vVol datastore object.
-        """
-        sc_id = None
 
+        Raises:
+            ValueError:
+                - If no connected ESXi hosts are found within the cluster.
+                - If the requested protocol endpoint already exists on the FlashArray.
+        """
         if not protocol_endpoint_name:
             protocol_endpoint_name = 'pure-protocol-endpoint'
 
         hgroup, connected_esxi_hosts = self.verify_vsphere_cluster(cluster_name)
+
+        if not connected_esxi_hosts:
+            raise ValueError(f'No connected hosts found for cluster "{cluster_name}".')
+
         existing_protocol_endpoints = self.flasharray.list_volumes(protocol_endpoint=True)
+        existing_endpoint_names = {endpoint['name'] for endpoint in existing_protocol_endpoints or []}
 
-        if connected_esxi_hosts:
-            if not existing_protocol_endpoints:
-                fa_protocol_endpoint = self.flasharray.create_conglomerate_volume(protocol_endpoint_name)
-                self.flasharray.connect_hgroup(hgroup, fa_protocol_endpoint['name'])
-            else:
-                for endpoint in existing_protocol_endpoints:
-                    if endpoint['name'] == protocol_endpoint_name:
-                        raise ValueError(f'"{protocol_endpoint_name}" already exists. Cancelling creation of vVol'
-                                         f' datastore.')
-                    else:
-                        fa_protocol_endpoint = self.flasharray.create_conglomerate_volume(protocol_endpoint_name)
-                        self.flasharray.connect_hgroup(hgroup, fa_protocol_endpoint['name'])
+        if protocol_endpoint_name in existing_endpoint_names:
+            raise ValueError(f'"{protocol_endpoint_name}" already exists. Cancelling creation of vVol'
+                             f' datastore.')
+
+        fa_protocol_endpoint = self.flasharray.create_conglomerate_volume(protocol_endpoint_name)
+        self.flasharray.connect_hgroup(hgroup, fa_protocol_endpoint['name'])
 
         Datastores.rescan_esxi_storage(connected_esxi_hosts)
         storage_manager = self.sms_instance.QueryStorageManager()
         storage_containers = storage_manager.QueryStorageContainer().storageContainer
 
-        for container in storage_containers:
-            # Example of arrayId output:
-            # (str) ['com.purestorage:3b7b308d-98f9-425e-87a1-3e57ada49658']
-            if container.arrayId[0].split(':')[1] == self.flasharray.get().get('id'):
-                sc_id = container.uuid
+        array_id = self.array_info.get('id')
+        # Example of arrayId output:
+        # (str) ['com.purestorage:3b7b308d-98f9-425e-87a1-3e57ada49658']
+        sc_id = next((container.uuid for container in storage_containers
+                      if container.arrayId[0].split(':', 1)[1] == array_id), None)
+
+        vvol_spec = vim.HostDatastoreSystemVvolDatastoreSpec(name=ds_name, scId=sc_id)
 
-        for esxi_host in connected_esxi_hosts:
-            host_dssystem = esxi_host.configManager.datastoreSystem
-            vvol_spec = vim.HostDatastoreSystemVvolDatastoreSpec(name=ds_name, scId=sc_id)
-            vvol_datastore = host_dssystem.CreateVvolDatastore(vvol_spec)
+        # Each host mounts the datastore independently, so the blocking vCenter calls are
+        # dispatched in parallel. Concurrency is capped to avoid vCenter request throttling.
+        with futures.ThreadPoolExecutor(max_workers=min(16, len(connected_esxi_hosts))) as executor:
+            created_datastores = list(executor.map(
+                lambda esxi_host: esxi_host.configManager.datastoreSystem.CreateVvolDatastore(vvol_spec),
+                connected_esxi_hosts))
+        # Every host returns the same datastore object, so any of the results can be returned.
+        vvol_datastore = created_datastores[-1]
 
         Datastores.rescan_esxi_storage(connected_esxi_hosts)
 
@@ -279,7 +363,7 @@ class VvolDatastores(Datastores):
         """
         all_networks = self.flasharray.list_network_interfaces()
         fa_ctlr = None
-        fa_name = self.flasharray.get()['array_name']
+        fa_name = self.array_info['array_name']
         storage_manager = self.sms_instance.QueryStorageManager()
 
         for network in all_networks:
@@ -323,12 +407,17 @@ class VvolDatastores(Datastores):
                 - See VIM documentation for all possible exceptions raised.
         """
         start_time = time.time()
-        while task.QuerySmsTaskInfo().state in sms.SmsTaskState.running:
-            time.sleep(0.1)
-            elapsed_time = time.time()
-            if (elapsed_time - start_time) > timeout:
-                raise TimeoutException("Timed out waiting for task to complete. Please try again.")
+        delay = 0.1
 
-        task_state = task.QuerySmsTaskInfo()
+        while True:
+            task_state = task.QuerySmsTaskInfo()
+            if task_state.state not in sms.SmsTaskState.running:
+                return task_state
+
+            if (time.time() - start_time) > timeout:
+                raise TimeoutException("Timed out waiting for task to complete. Please try again.")
 
-        return task_state
+            # Back off between polls (capped at one second) so long-running tasks are not hammered
+            # with a status RPC every 100ms.
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
@@ -1,9 +1,16 @@
 """Utils for working with Pure Storage Volumes and VMware VMFS/vVol Datastores."""
 
+import sys
+
 from pyVmomi import vim
+from pyVmomi import vmodl
 
 PURE_IDENTIFIER = '24a937'
 
+# Where the Pure Storage identifier sits within each canonical name format, keyed by the
+# name's three character prefix.
+_IDENTIFIER_OFFSETS = {'naa': slice(5, 11), 'eui': slice(20, 26)}
+
 def compare_identifier(device):
     """ Compare device canonical name to the Pure Storage identifier.
 
@@ -17,24 +24,23 @@ def compare_identifier(device):
     # naa.624a93703b7b308d98f9425e000113e9
     # eui.003b7b308d98f94224a9375e00018816
 
+    offset = _IDENTIFIER_OFFSETS.get(device[:3])
+
     pure_device = None
-    if device.startswith('naa'):
-        if device[5:11] == PURE_IDENTIFIER:
-            pure_device = device
-    elif device.startswith('eui'):
-        if device[20:26] == PURE_IDENTIFIER:
-            pure_device = device
+    if offset and device[offset] == PURE_IDENTIFIER:
+        pure_device = device
     return pure_device
 
 
-def fa_host_to_esxi_mapping(esxi_host, fa_hosts, flasharray):
+def fa_host_to_esxi_mapping(esxi_host, wwpn_index, iqn_index, fa_name):
     """Map an ESXi host to a Pure Storage FlashArray host object.
 
     Args:
         esxi_host (vim.HostSystem): ESXi host to verify against FA host objects.
-        fa_hosts (list): List of FlashArray host objects and their properties.
-        flasharray (purestorage.FlashArray): Verified or unverified session to
-        a Pure Storage FlashArray.
+        wwpn_index (dict): Mapping of lowercase WWPN to FlashArray host object.
+        iqn_index (dict): Mapping of lowercase IQN to FlashArray host object.
+        fa_name (str): Name of the Pure Storage FlashArray the host objects
+        belong to.
 
     Returns:
         match (dict): FlashArray host object and properties.
@@ -58,36 +64,33 @@ def fa_host_to_esxi_mapping(esxi_host, fa_hosts, flasharray):
             # will be updated once it is available.
             continue
 
+        # Normalize once per HBA; the index keys were lowercased and interned at ingest, so the
+        # lookups below compare interned strings rather than allocating per comparison.
+        hba_identifier = sys.intern(hba_identifier.lower())
+
         if hba_identifier[0].isdigit():
-            for host in fa_hosts:
-                if match:
-                    break
-                for wwpn in host['wwn']:
-                    if hba_identifier.lower() == wwpn.lower():
-                        match = host
-                        break
+            match = wwpn_index.get(hba_identifier)
         elif hba_identifier.startswith('iqn'):
-            for host in fa_hosts:
-                if match:
-                    break
-                for iqn in host['iqn']:
-                    if hba_identifier.lower() == iqn.lower():
-                        match = host
-                        break
+            match = iqn_index.get(hba_identifier)
+
+        if match:
+            break
+
     if not match:
-        fa_info = flasharray.get()
         raise ValueError(f'No host object could be found on Pure Storage Flasharray '
-                         f'"{fa_info.get("array_name")}" for ESXi host "{esxi_host.name}".')
+                         f'"{fa_name}" for ESXi host "{esxi_host.name}".')
 
     return match
 
 
-def fa_hgroup_to_vc_cluster_mapping(vc_cluster, flasharray):
+def fa_hgroup_to_vc_cluster_mapping(vc_cluster, flasharray, array_info):
     """Map a vSphere Cluster to a FlashArray host group object.
 
     Args:
         vc_cluster (vim.ClusterComputeResource): vSphere cluster to verify
         against the Pure Storage FlashArray host group object.
+        flasharray (purestorage.FlashArray): Existing session to FlashArray.
+        array_info (dict): FlashArray attributes as returned by flasharray.get().
 
     Returns:
         host_group (str): Name of the host group associated with the ESXi cluster.
@@ -96,14 +99,24 @@ def fa_hgroup_to_vc_cluster_mapping(vc_cluster, flasharray):
         ValueError: If a matched FlashArray host object is not associated with
         a host group.
     """
-    fa_name = flasharray.get().get("array_name")
+    fa_name = array_info.get("array_name")
     host_groups = set()
 
+    # One REST call returns every host with its wwn, iqn, and hgroup attributes populated — the
+    # REST 1.x host listing is eager, so no per-host follow-up requests are made below. Avoid
+    # passing all=True here: that switches the response to per-connection rows and would break
+    # the indexing.
     fa_hosts = flasharray.list_hosts()
     esxi_hosts = vc_cluster.host
 
+    # Index the FlashArray hosts by port identifier once so each HBA lookup below is a single
+    # dict access instead of a scan over every host's ports. Keys are lowercased and interned
+    # here at ingest so no further normalization happens per comparison.
+    wwpn_index = {sys.intern(wwpn.lower()): host for host in fa_hosts for wwpn in host.get('wwn') or ()}
+    iqn_index = {sys.intern(iqn.lower()): host for host in fa_hosts for iqn in host.get('iqn') or ()}
+
     for esxi in esxi_hosts:
-        matched_host = (fa_host_to_esxi_mapping(esxi, fa_hosts, flasharray))
+        matched_host = (fa_host_to_esxi_mapping(esxi, wwpn_index, iqn_index, fa_name))
 
         if matched_host['hgroup']:
             host_groups.add(matched_host['hgroup'])
@@ -124,30 +137,70 @@ def fa_hgroup_to_vc_cluster_mapping(vc_cluster, flasharray):
     return next(iter(host_groups))
 
 
-def get_datastore_identifier(datastore):
-    """Revieve the NAA identifiers for the requested datastore object.
+def get_datastore_identifier(ds_props):
+    """Revieve the NAA identifiers for the requested datastore properties.
 
     Args:
-        ds(vim.Datastore): Datastore object that the NAA is needed for.
+        ds_props (dict): Datastore properties as returned by retrieve_view_properties().
 
     Returns:
         naa_ids(set): Returns a set of NAA(s) associated with the datastore.
     """
     # The variable 'devices' is returned as a set() due to vVols reporting
     # the device ID multiple times. That way VMFS and vVol are consistent.
-    ds_type = datastore.summary.type
+    devices = set()
+    ds_type = ds_props.get('summary.type')
 
     if ds_type == 'VMFS':
-        extents = datastore.info.vmfs.extent
+        extents = ds_props.get('info.vmfs.extent') or []
         devices = {extent.diskName for extent in extents}
     elif ds_type == 'VVOL':
-        host_endpoints = datastore.info.vvolDS.hostPE
+        host_endpoints = ds_props.get('info.vvolDS.hostPE') or []
         # VMware only returns one item to be used thus specifying the first available item.
         devices = {endpoint.protocolEndpoint[0].deviceId for endpoint in host_endpoints}
 
     return devices
 
 
+def retrieve_view_properties(vsphere_content, container_view, obj_type, path_set):
+    """Retrieve requested properties for every object in a container view with a single call.
+
+    Fetching attributes directly from pyVmomi managed objects costs one round-trip per access.
+    Issuing one PropertyCollector request for the whole view keeps the RPC count constant no
+    matter how many objects are in the inventory.
+
+    Args:
+        vsphere_content (vim.ServiceInstanceContent): All available content within the vSphere env.
+        container_view (vim.view.ContainerView): Live container view holding the objects of interest.
+        obj_type (type): Managed object type the properties belong to (e.g. vim.Datastore).
+        path_set (list): Property paths to retrieve (e.g. ['summary.type']).
+
+    Returns:
+        results (list): List of (managed object, dict of property path to value) tuples.
+    """
+    traversal_spec = vmodl.query.PropertyCollector.TraversalSpec(
+        name='view', type=vim.view.ContainerView, path='view', skip=False)
+    obj_spec = vmodl.query.PropertyCollector.ObjectSpec(
+        obj=container_view, skip=True, selectSet=[traversal_spec])
+    prop_spec = vmodl.query.PropertyCollector.PropertySpec(type=obj_type, pathSet=path_set)
+    filter_spec = vmodl.query.PropertyCollector.FilterSpec(objectSet=[obj_spec], propSet=[prop_spec])
+
+    collector = vsphere_content.propertyCollector
+    options = vmodl.query.PropertyCollector.RetrieveOptions()
+    results = []
+
+    retrieved = collector.RetrievePropertiesEx(specSet=[filter_spec], options=options)
+    while retrieved:
+        for obj_content in retrieved.objects:
+            props = {prop.name: prop.val for prop in obj_content.propSet}
+            results.append((obj_content.obj, props))
+        if not retrieved.token:
+            break
+        retrieved = collector.ContinueRetrievePropertiesEx(retrieved.token)
+
+    return results
+
+
 def get_device_path(devices, vol_serial_num):
     """Get ESXi host disk device path associated with an array volume.
 
@@ -165,20 +218,22 @@ def get_device_path(devices, vol_serial_num):
     # /vmfs/devices/disks/eui.003b7b308d98f94224a9375e00018816
     # /vmfs/devices/disks/naa.624a93703b7b308d98f9425e000113e9
 
-    potential_device_paths = []
     match = None
 
     for device in devices:
-        # Example output after split: naa.624a93703b7b308d98f9425e000113e9
-        dev = device.devicePath.split('/')[4]
+        device_path = device.devicePath
+        # The '/vmfs/devices/disks/' prefix is fixed at 20 characters, so the canonical name
+        # starts at a known offset and no intermediate split is needed.
+        # Example after slicing: naa.624a93703b7b308d98f9425e000113e9
+        dev = device_path[20:]
         if dev.startswith('naa'):
             if dev[12:] == vol_serial_num:
-                match = device.devicePath
+                match = device_path
                 break
         elif dev.startswith('eui'):
             temp_dev = dev[6:].replace(PURE_IDENTIFIER, '')
             if temp_dev == vol_serial_num:
-                match = device.devicePath
+                match = device_path
                 break
 
     return match
@@ -6,11 +6,32 @@ import os
 from logging import handlers
 from pathlib import Path
 
-HOME = str(Path.home())
-LOG_FILE = os.path.join(HOME, 'purepyvmware.log')
 FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-LOG_HANDLER = handlers.RotatingFileHandler(LOG_FILE, maxBytes=2097152, backupCount=3)
-LOG_HANDLER.setLevel(logging.INFO)
-LOG_HANDLER.setFormatter(FORMATTER)
 
-logging.basicConfig(level=logging.INFO, handlers=[LOG_HANDLER])
+_log_configured = False
+
+
+def get_logger(name):
+    """Return a logger that writes to the purepyvmware log file.
+
+    The rotating file handler opens (and possibly rotates) the log file in the user's home
+    directory, so it is installed lazily on the first call rather than at import time. Short
+    lived CLI invocations that never log avoid the disk I/O entirely.
+
+    Args:
+        name (str): Name for the requested logger, typically __name__ of the calling module.
+
+    Returns:
+        logger (logging.Logger): Logger configured with the shared rotating file handler.
+    """
+    global _log_configured
+
+    if not _log_configured:
+        log_file = os.path.join(str(Path.home()), 'purepyvmware.log')
+        log_handler = handlers.RotatingFileHandler(log_file, maxBytes=2097152, backupCount=3)
+        log_handler.setLevel(logging.INFO)
+        log_handler.setFormatter(FORMATTER)
+        logging.basicConfig(level=logging.INFO, handlers=[log_handler])
+        _log_configured = True
+
+    return logging.getLogger(name)